@@ -7,6 +7,7 @@ import os
 import uuid # Necessário para gerar IDs de sessão únicos
 from typing import Optional, Any
 
+import httpx # Dependência do supabase-py; usado para identificar timeouts e falhas de conexão
 from flask import (Flask, jsonify, redirect, render_template, request,
                    session, url_for)
 from supabase import Client, create_client # Importa o cliente Supabase
@@ -15,6 +16,7 @@ import jwt  # Adicionado para debug do token Supabase
 
 # Importa os cenários e a função de emoji do módulo local
 from scenarios import SCENARIOS, get_emoji
+from vote_spool import VoteReplayer, VoteSpool
 
 load_dotenv()
 
@@ -28,10 +30,16 @@ app.config["SECRET_KEY"] = secret
 if not os.environ.get("FLASK_SECRET_KEY"):
     app.logger.warning("Nenhum FLASK_SECRET_KEY configurado: usando UUID aleatório para SECRET_KEY")
 
+# In production, debug should be set to False
+DEBUG_MODE = os.environ.get("FLASK_ENV") != "production"
+
 # --- Configuração do Supabase ---
 
 SUPABASE_URL: str | None = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY: str | None = os.environ.get("SUPABASE_KEY")
+# Timeout (em segundos) das chamadas ao Supabase. Curto de propósito: um backend travado
+# deve cair logo no spool local em vez de segurar a requisição do usuário.
+SUPABASE_TIMEOUT: float = float(os.environ.get("SUPABASE_TIMEOUT", "3"))
 supabase: Any | None = None # Inicializa como None
 
 # Validação básica das credenciais e inicialização do cliente
@@ -59,27 +67,224 @@ else:
         
         # Criação do cliente tentando diferentes formas dependendo da versão
         try:
-            # Primeiro tenta a forma com headers explícitos
-            supabase = create_client(SUPABASE_URL, SUPABASE_KEY, headers=headers)
-            app.logger.info("Cliente Supabase inicializado com headers personalizados.")
-        except TypeError:
-            # Se falhar, tenta a forma padrão
-            supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-            # E tenta definir os headers depois
-            if hasattr(supabase, '_client') and hasattr(supabase._client, 'headers'):
-                supabase._client.headers.update(headers)
-                app.logger.info("Cliente Supabase inicializado com headers atualizados após criação.")
-            else:
-                app.logger.info("Cliente Supabase inicializado com configuração padrão.")
-                
+            # Versões recentes: headers e timeout curto via ClientOptions
+            from supabase import ClientOptions
+            options = ClientOptions(headers=headers, postgrest_client_timeout=SUPABASE_TIMEOUT)
+            supabase = create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+            app.logger.info(f"Cliente Supabase inicializado com headers personalizados e timeout de {SUPABASE_TIMEOUT}s.")
+        except (ImportError, TypeError):
+            app.logger.warning("ClientOptions indisponível: o cliente Supabase usará o timeout padrão da biblioteca.")
+            try:
+                # Tenta a forma com headers explícitos
+                supabase = create_client(SUPABASE_URL, SUPABASE_KEY, headers=headers)
+                app.logger.info("Cliente Supabase inicializado com headers personalizados.")
+            except TypeError:
+                # Se falhar, tenta a forma padrão
+                supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+                # E tenta definir os headers depois
+                if hasattr(supabase, '_client') and hasattr(supabase._client, 'headers'):
+                    supabase._client.headers.update(headers)
+                    app.logger.info("Cliente Supabase inicializado com headers atualizados após criação.")
+                else:
+                    app.logger.info("Cliente Supabase inicializado com configuração padrão.")
+
     except Exception as e:
         app.logger.error(f"Falha ao inicializar o cliente Supabase: {e}")
         supabase = None # Garante que seja None em caso de erro
 # --- Fim Configuração do Supabase ---
 
+# --- Spool local de votos ---
+# Votos que o Supabase rejeita (erro ou timeout) são gravados num journal SQLite
+# local e reenviados em segundo plano quando o backend volta a responder.
+VOTE_SPOOL_PATH = os.environ.get("VOTE_SPOOL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "vote_spool.sqlite3"))
+# Criados apenas quando o Supabase está configurado (ver o fim desta seção)
+vote_spool: VoteSpool | None = None
+vote_replayer: VoteReplayer | None = None
+
+# Códigos PostgREST/Postgres que indicam backend fora do ar, e não rejeição do voto:
+# falhas de conexão do PostgREST (PGRST00x), conexão (08), recursos (53),
+# intervenção do operador/timeout (57), erro de sistema (58) e erro interno (XX).
+OUTAGE_ERROR_CODE_PREFIXES = ("PGRST00", "08", "53", "57", "58", "XX")
+
+def is_backend_outage(err: Exception) -> bool:
+    """
+    Indica se o erro significa Supabase indisponível (timeout, conexão, 5xx),
+    em oposição a uma rejeição do próprio voto (validação, RLS, etc.).
+    """
+    if isinstance(err, httpx.TransportError):
+        return True
+    # APIError do postgrest expõe o código do erro; sem corpo JSON, o código é o status HTTP
+    code = getattr(err, 'code', None)
+    if isinstance(code, int):
+        return code >= 500
+    if isinstance(code, str):
+        return code.startswith(OUTAGE_ERROR_CODE_PREFIXES)
+    return False
+
+def insert_vote(vote_data: dict[str, Any]) -> None:
+    """
+    Insere um voto na tabela 'votes' do Supabase. Lança exceção em caso de falha.
+    """
+    # Cria headers explícitos para garantir que o role "anon" seja aplicado na requisição
+    insert_headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "X-Client-Info": "supabase-py/debug"
+    }
+
+    try:
+        # Primeiro tenta usar o método .headers() para definir headers para esta operação específica
+        # (no supabase-py 2.x, `headers` é um atributo, não um método; os headers já vêm do ClientOptions)
+        if callable(getattr(supabase.table('votes'), 'headers', None)):
+            supabase.table('votes').headers(insert_headers).insert(vote_data).execute()
+        else:
+            # Se não tiver o método headers(), usa o método padrão
+            supabase.table('votes').insert(vote_data).execute()
+    except Exception as insert_err:
+        if is_backend_outage(insert_err):
+            # Timeout, falha de conexão ou 5xx: o backend está fora, não adianta tentar o fallback
+            if vote_replayer is not None:
+                vote_replayer.mark_unhealthy()
+            raise
+        # Se falhar, tenta uma abordagem alternativa - usando a API diretamente (se disponível)
+        app.logger.warning(f"Falha no método padrão de insert: {insert_err}")
+
+        if not hasattr(supabase, 'postgrest'):
+            # Se não tiver acesso ao postgrest, reraise a exceção original
+            raise insert_err
+        try:
+            # Tenta usar o client postgrest diretamente
+            supabase.postgrest.from_('votes').insert(vote_data, headers=insert_headers).execute()
+        except Exception as postgrest_err:
+            raise Exception(f"Falha também no insert via postgrest: {postgrest_err}")
+
+def replay_vote(vote_data: dict[str, Any]) -> None:
+    """
+    Reenvia um voto do spool, ignorando-o se já existir no Supabase
+    (ex.: um insert que deu timeout mas foi gravado).
+    """
+    existing = (supabase.table('votes').select('id')
+                .eq('session_uuid', vote_data['session_uuid'])
+                .eq('scenario_id', vote_data['scenario_id'])
+                .limit(1).execute())
+    if existing.data:
+        app.logger.debug(f"Voto do spool já existe no Supabase: {vote_data}")
+        return
+
+    # O cache de contagens não é alterado aqui: fetch_vote_counts o atualiza
+    # na próxima votação com o Supabase disponível.
+    insert_vote(vote_data)
+
+def fetch_vote_counts(scenario_id: int) -> tuple[int, int]:
+    """
+    Busca a contagem de votos (sim, não) de um cenário no Supabase e atualiza o cache.
+    """
+    # Contagem de votos 'sim' (usando count='exact')
+    yes_count_res = supabase.table('votes').select('id', count='exact').eq('scenario_id', scenario_id).eq('decision', True).execute()
+    yes_votes = yes_count_res.count if yes_count_res.count is not None else 0
+
+    # Contagem de votos 'não'
+    no_count_res = supabase.table('votes').select('id', count='exact').eq('scenario_id', scenario_id).eq('decision', False).execute()
+    no_votes = no_count_res.count if no_count_res.count is not None else 0
+
+    # Guarda a contagem no spool (volume persistente) para servir durante uma queda
+    if vote_spool is not None:
+        try:
+            vote_spool.save_counts(scenario_id, yes_votes, no_votes)
+        except Exception as spool_err:
+            app.logger.error(f"Erro ao gravar contagem no spool para scenario {scenario_id}: {spool_err}")
+    return yes_votes, no_votes
+
+def cached_vote_counts(scenario_id: int) -> tuple[int, int] | None:
+    """
+    Contagem de votos servida durante indisponibilidade do Supabase:
+    última contagem conhecida somada aos votos ainda no spool.
+    Retorna None se não houver contagem conhecida para o cenário.
+    """
+    if vote_spool is None:
+        return None
+    try:
+        counts = vote_spool.last_counts(scenario_id)
+        if counts is None:
+            return None
+        pending_yes, pending_no = vote_spool.pending_counts(scenario_id)
+    except Exception as spool_err:
+        app.logger.error(f"Erro ao ler contagem do spool para scenario {scenario_id}: {spool_err}")
+        return None
+    return counts[0] + pending_yes, counts[1] + pending_no
+
+if supabase:
+    try:
+        vote_spool = VoteSpool(VOTE_SPOOL_PATH)
+        vote_replayer = VoteReplayer(vote_spool, replay_vote, is_backend_outage, log=app.logger)
+        # Drena votos que ficaram no spool antes de um restart, sem esperar por uma nova votação.
+        # Com o reloader do modo debug, o processo pai só observa arquivos: a thread roda no processo filho.
+        is_reloader_parent = __name__ == "__main__" and DEBUG_MODE and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+        if not is_reloader_parent:
+            vote_replayer.start()
+    except Exception as e:
+        # Sem spool o app continua funcionando; votos que falharem no Supabase serão perdidos
+        app.logger.error(f"Falha ao abrir o spool local de votos em {VOTE_SPOOL_PATH}: {e}")
+        vote_spool = None
+        vote_replayer = None
+# --- Fim Spool local de votos ---
+
 # Define o número total de cenários
 TOTAL_SCENARIOS = len(SCENARIOS)
 
+def scenario_payload(index: int) -> dict[str, Any]:
+    """
+    Monta o JSON do cenário no índice dado, ou o sinal de conclusão se não houver mais cenários.
+    """
+    if index >= TOTAL_SCENARIOS:
+        return {
+            'is_complete': True,
+            'summary_url': url_for('index') # A rota index lida com o resumo
+        }
+    scenario = SCENARIOS[index]
+    return {
+        'is_complete': False,
+        'scenario': scenario,
+        'progress': (index / TOTAL_SCENARIOS) * 100,
+        'current_scenario_number': index + 1,
+        'total_scenarios': TOTAL_SCENARIOS,
+        'emoji': get_emoji(scenario['image'])
+    }
+
+def skip_decided_scenarios() -> int:
+    """
+    Avança current_index da sessão além dos cenários já votados e retorna o índice resultante.
+
+    O frontend exibe o próximo card antes de /next_scenario terminar; se a página for
+    recarregada nesse intervalo, o índice salvo ainda aponta para o cenário já votado.
+    """
+    current_index: int = session["current_index"]
+    decisions: dict[str, bool] = session["decisions"]
+    while current_index < TOTAL_SCENARIOS and str(SCENARIOS[current_index]["id"]) in decisions:
+        current_index += 1
+    if current_index != session["current_index"]:
+        app.logger.debug(f"Pulando cenários já votados: índice {session['current_index']} -> {current_index}")
+        session["current_index"] = current_index
+        session.modified = True
+    return current_index
+
+def results_payload(scenario_id: int, decision: bool, counts: tuple[int, int] | None, next_index: int) -> dict[str, Any]:
+    """
+    Monta o JSON de resultados da votação, já com o próximo cenário pré-carregado.
+    Sem contagem conhecida (`counts` None), envia counts_available=False no lugar dos números.
+    """
+    payload = {
+        'show_results': True,
+        'scenario_id': scenario_id,
+        'your_decision': decision,
+        'counts_available': counts is not None,
+        'next_scenario_url': url_for('next_scenario'), # URL para o próximo passo
+        'next': scenario_payload(next_index) # Próximo cenário pré-carregado
+    }
+    if counts is not None:
+        payload['yes_votes'], payload['no_votes'] = counts
+    return payload
+
 @app.route("/")
 def index() -> str:
     """
@@ -102,7 +307,7 @@ def index() -> str:
         
     session.modified = True # Marca como modificada ao inicializar valores
 
-    current_index: int = session["current_index"]
+    current_index: int = skip_decided_scenarios()
     decisions: dict[str, bool] = session["decisions"] # Chave é string agora
 
     # Verifica se todos os cenários foram concluídos
@@ -138,7 +343,9 @@ def handle_decision(): # Removido -> str para retornar Response ou Json
     Processa a decisão do usuário (Sim/Não) para o cenário atual.
 
     Armazena a decisão na sessão e envia para o Supabase.
-    Retorna dados do próximo cenário ou sinal de conclusão em JSON.
+    Retorna os resultados da votação já com os dados do próximo cenário (chave 'next'),
+    para que o frontend exiba o próximo card sem esperar por /next_scenario.
+    Sem resultados, retorna dados do próximo cenário ou sinal de conclusão em JSON.
     """
     if "current_index" not in session or "decisions" not in session or 'user_session_uuid' not in session:
         # Se a sessão estiver incompleta, redireciona para o início para reinicializar
@@ -147,7 +354,14 @@ def handle_decision(): # Removido -> str para retornar Response ou Json
         return jsonify({"error": "Session invalid, please reload.", "redirect": url_for("index")}), 400
 
 
-    current_index: int = session["current_index"]
+    # Um cenário já votado nesta sessão não recebe um segundo voto:
+    # avança o índice e devolve o próximo cenário
+    previous_index: int = session["current_index"]
+    current_index: int = skip_decided_scenarios()
+    if current_index != previous_index:
+        app.logger.warning(f"Decisão recebida para cenário já votado (índice {previous_index}). Avançando sem registrar.")
+        return jsonify(scenario_payload(current_index))
+
     session_modified_flag = False # Flag para marcar se a sessão foi modificada
 
     # Garante que ainda estamos dentro dos limites dos cenários
@@ -176,116 +390,82 @@ def handle_decision(): # Removido -> str para retornar Response ou Json
             
         # --- Integração Supabase ---
         if supabase and decision_bool is not None: # Verifica se o cliente foi inicializado e a decisão é válida
-            try:
-                # user_session_uuid já deve existir por causa da rota index
-                user_uuid = session['user_session_uuid']
+            # user_session_uuid já deve existir por causa da rota index
+            user_uuid = session['user_session_uuid']
+
+            vote_data = {
+                'scenario_id': scenario_id,
+                'decision': decision_bool,
+                'session_uuid': user_uuid
+            }
+            app.logger.debug(f"[DEBUG] vote_data: {vote_data}")
+
+            # Se o Supabase falhou recentemente, não espera pela chamada: vai direto para o spool
+            if vote_replayer is None or vote_replayer.backend_healthy:
+                try:
+                    # Debugging do token/cliente Supabase
+                    try:
+                        # Tenta decodificar a chave SUPABASE_KEY para verificar as claims
+                        decoded_key = jwt.decode(SUPABASE_KEY, options={"verify_signature": False})
+                        app.logger.debug(f"[DEBUG] Decoded SUPABASE_KEY: {decoded_key}")
 
-                vote_data = {
-                    'scenario_id': scenario_id,
-                    'decision': decision_bool,
-                    'session_uuid': user_uuid
-                }
-                app.logger.debug(f"[DEBUG] vote_data: {vote_data}")
+                        # Tenta acessar as propriedades do cliente Supabase para debug
+                        if hasattr(supabase, 'auth') and hasattr(supabase.auth, 'session'):
+                            session_info = supabase.auth.session()
+                            app.logger.debug(f"[DEBUG] Supabase auth session: {session_info}")
 
-                # Debugging do token/cliente Supabase
-                try:
-                    # Tenta decodificar a chave SUPABASE_KEY para verificar as claims
-                    decoded_key = jwt.decode(SUPABASE_KEY, options={"verify_signature": False})
-                    app.logger.debug(f"[DEBUG] Decoded SUPABASE_KEY: {decoded_key}")
-                    
-                    # Tenta acessar as propriedades do cliente Supabase para debug
-                    if hasattr(supabase, 'auth') and hasattr(supabase.auth, 'session'):
-                        session_info = supabase.auth.session()
-                        app.logger.debug(f"[DEBUG] Supabase auth session: {session_info}")
-                    
-                    # Tentativa de verificar o tipo de chave (anon vs. service_role)
-                    if SUPABASE_KEY and SUPABASE_KEY.startswith("eyJ"):
-                        app.logger.debug("[DEBUG] SUPABASE_KEY parece ser um token JWT válido")
-                    else:
-                        app.logger.debug("[DEBUG] SUPABASE_KEY não parece ser um token JWT")
-                        
-                except Exception as decode_err:
-                    app.logger.error(f"[DEBUG] Erro ao decodificar SUPABASE_KEY ou acessar session: {decode_err}")
-
-                # Tenta acessar os headers que serão enviados para entender o role
-                try:
-                    # Acessa o método interno para obter headers (se disponível)
-                    if hasattr(supabase, '_client'):
-                        headers = getattr(supabase._client, 'headers', {})
-                        app.logger.debug(f"[DEBUG] Supabase client headers: {headers}")
-                except Exception as headers_err:
-                    app.logger.error(f"[DEBUG] Erro ao acessar headers do cliente: {headers_err}")
-
-                # Assume que sua tabela se chama 'votes'
-                # Cria headers explícitos para garantir que o role "anon" seja aplicado na requisição
-                insert_headers = {
-                    "apikey": SUPABASE_KEY,
-                    "Authorization": f"Bearer {SUPABASE_KEY}",
-                    "X-Client-Info": "supabase-py/debug"
-                }
-                
-                # Tenta o insert com headers explícitos
-                try:
-                    # Primeiro tenta usar o método .headers() para definir headers para esta operação específica
-                    if hasattr(supabase.table('votes'), 'headers'):
-                        data, count = supabase.table('votes').headers(insert_headers).insert(vote_data).execute()
-                    else:
-                        # Se não tiver o método headers(), usa o método padrão
-                        data, count = supabase.table('votes').insert(vote_data).execute()
-                    
+                        # Tentativa de verificar o tipo de chave (anon vs. service_role)
+                        if SUPABASE_KEY and SUPABASE_KEY.startswith("eyJ"):
+                            app.logger.debug("[DEBUG] SUPABASE_KEY parece ser um token JWT válido")
+                        else:
+                            app.logger.debug("[DEBUG] SUPABASE_KEY não parece ser um token JWT")
+
+                    except Exception as decode_err:
+                        app.logger.error(f"[DEBUG] Erro ao decodificar SUPABASE_KEY ou acessar session: {decode_err}")
+
+                    # Tenta acessar os headers que serão enviados para entender o role
+                    try:
+                        # Acessa o método interno para obter headers (se disponível)
+                        if hasattr(supabase, '_client'):
+                            headers = getattr(supabase._client, 'headers', {})
+                            app.logger.debug(f"[DEBUG] Supabase client headers: {headers}")
+                    except Exception as headers_err:
+                        app.logger.error(f"[DEBUG] Erro ao acessar headers do cliente: {headers_err}")
+
+                    # Assume que sua tabela se chama 'votes'
+                    insert_vote(vote_data)
                     app.logger.debug(f"Voto registrado no Supabase para session_uuid {user_uuid}, scenario_id {scenario_id}")
 
                     # --- Contagem de Votos ---
-                    yes_votes = 0
-                    no_votes = 0
                     try:
-                        # Contagem de votos 'sim' (usando count='exact')
-                        yes_count_res = supabase.table('votes').select('id', count='exact').eq('scenario_id', scenario_id).eq('decision', True).execute()
-                        yes_votes = yes_count_res.count if yes_count_res.count is not None else 0
-
-                        # Contagem de votos 'não'
-                        no_count_res = supabase.table('votes').select('id', count='exact').eq('scenario_id', scenario_id).eq('decision', False).execute()
-                        no_votes = no_count_res.count if no_count_res.count is not None else 0
-
-                        app.logger.debug(f"Contagem de votos para scenario {scenario_id}: Sim={yes_votes}, Não={no_votes}")
-
+                        counts = fetch_vote_counts(scenario_id)
+                        app.logger.debug(f"Contagem de votos para scenario {scenario_id}: Sim={counts[0]}, Não={counts[1]}")
                     except Exception as agg_err:
                         app.logger.error(f"Erro ao buscar contagem de votos para scenario {scenario_id}: {agg_err}")
-                        # Mantém yes_votes e no_votes como 0 (fallback)
+                        # Usa a última contagem conhecida (fallback)
+                        counts = cached_vote_counts(scenario_id)
                     # --- Fim Contagem de Votos ---
 
                     # Retorna os resultados para exibição no frontend
                     # NÃO avança o cenário aqui
-                    return jsonify({
-                        'show_results': True,
-                        'scenario_id': scenario_id,
-                        'your_decision': decision_bool,
-                        'yes_votes': yes_votes,
-                        'no_votes': no_votes,
-                        'next_scenario_url': url_for('next_scenario') # URL para o próximo passo
-                    })
-
-                except Exception as insert_err:
-                    # Se falhar, tenta uma abordagem alternativa - usando a API diretamente (se disponível)
-                    app.logger.warning(f"Falha no método padrão de insert: {insert_err}")
-                    
-                    if hasattr(supabase, 'postgrest'):
-                        try:
-                            # Tenta usar o client postgrest diretamente
-                            data, count = supabase.postgrest.from_('votes').insert(vote_data, headers=insert_headers).execute()
-                            app.logger.debug(f"Voto registrado via postgrest para session_uuid {user_uuid}, scenario_id {scenario_id}")
-                        except Exception as postgrest_err:
-                            raise Exception(f"Falha também no insert via postgrest: {postgrest_err}")
-                    else:
-                        # Se não tiver acesso ao postgrest, reraise a exceção original
-                        raise insert_err
-
-            except Exception as e:
-                app.logger.error(f"Erro ao salvar voto no Supabase para scenario_id {scenario_id}: {e}")
-                # Considerar estratégia de fallback aqui se necessário
-                # Por enquanto, apenas logamos o erro, a decisão ainda está na sessão.
-                # Se houve erro no Supabase, podemos decidir avançar sem mostrar resultados
-                # ou retornar um erro específico. Por ora, vamos deixar avançar.
+                    return jsonify(results_payload(scenario_id, decision_bool, counts, current_index + 1))
+
+                except Exception as e:
+                    # insert_vote já marca o backend como indisponível em caso de queda;
+                    # a rejeição de um único voto não deve desviar todos os usuários para o spool.
+                    app.logger.error(f"Erro ao salvar voto no Supabase para scenario_id {scenario_id}: {e}")
+
+            # Supabase indisponível: grava o voto no spool local para reenvio posterior
+            # e mostra os resultados a partir da contagem em cache.
+            if vote_spool is not None:
+                try:
+                    vote_spool.append(vote_data)
+                    app.logger.info(f"Voto gravado no spool local para session_uuid {user_uuid}, scenario_id {scenario_id}")
+                    counts = cached_vote_counts(scenario_id)
+                    return jsonify(results_payload(scenario_id, decision_bool, counts, current_index + 1))
+                except Exception as spool_err:
+                    # Sem spool, a decisão continua apenas na sessão; avançamos sem mostrar resultados.
+                    app.logger.error(f"Erro ao gravar voto no spool local para scenario_id {scenario_id}: {spool_err}")
         # --- Fim Integração Supabase ---
 
         # Se a decisão foi inválida (None), retorna erro
@@ -294,7 +474,7 @@ def handle_decision(): # Removido -> str para retornar Response ou Json
              return jsonify({"error": "Invalid decision provided."}), 400
 
         # Se chegou aqui, significa que a decisão foi válida, mas ou o Supabase não está ativo
-        # ou houve um erro ao salvar/contar votos. Neste caso, avançamos o cenário sem mostrar resultados.
+        # ou o voto não pôde ser salvo nem no Supabase nem no spool local. Neste caso, avançamos o cenário sem mostrar resultados.
         # (Comportamento original)
         session["current_index"] = current_index + 1
         session.modified = True # Marca a sessão como modificada
@@ -303,28 +483,8 @@ def handle_decision(): # Removido -> str para retornar Response ou Json
         # Recalcula o índice atual após incremento
         current_index = session["current_index"]
 
-        # Verifica se todos os cenários foram concluídos
-        if current_index >= TOTAL_SCENARIOS:
-            # Retorna um sinal de conclusão e a URL do resumo
-            return jsonify({
-                'is_complete': True,
-                'summary_url': url_for('index') # A rota index lida com o resumo
-            })
-        else:
-            # Obtém os dados do próximo cenário (agora com o índice atualizado)
-            next_scenario = SCENARIOS[current_index]
-            progress = (current_index / TOTAL_SCENARIOS) * 100
-            emoji = get_emoji(next_scenario['image'])
-
-            # Retorna os dados do próximo cenário em formato JSON
-            return jsonify({
-                'is_complete': False,
-                'scenario': next_scenario,
-                'progress': progress,
-                'current_scenario_number': current_index + 1,
-                'total_scenarios': TOTAL_SCENARIOS,
-                'emoji': emoji
-            })
+        # Retorna os dados do próximo cenário ou o sinal de conclusão
+        return jsonify(scenario_payload(current_index))
     else:
         # Se current_index >= TOTAL_SCENARIOS (já completou)
         app.logger.warning("Recebida decisão quando todos os cenários já foram completados.")
@@ -336,58 +496,31 @@ def handle_decision(): # Removido -> str para retornar Response ou Json
 @app.route("/next_scenario")
 def next_scenario():
     """
-    Avança para o próximo cenário na sessão e retorna seus dados.
-    Chamado pelo frontend após o usuário visualizar os resultados da votação.
+    Avança para o próximo cenário na sessão.
+    Chamado pelo frontend (sem esperar a resposta) ao exibir o próximo card, cujos dados
+    já vieram na resposta de /decision. Retorna apenas o novo estado do índice.
     """
-    if "current_index" not in session:
+    if "current_index" not in session or "decisions" not in session:
         app.logger.warning("Sessão sem current_index acessando /next_scenario. Redirecionando.")
         # Retornar erro ou redirecionar? Retornar erro é melhor para fetch API.
         return jsonify({"error": "Session invalid, please reload.", "redirect": url_for("index")}), 400
 
-    # Incrementa o índice do cenário
-    current_index = session.get("current_index", -1) # Pega o índice atual
-    current_index += 1
-    session["current_index"] = current_index
-    session.modified = True
+    # Avança apenas além dos cenários já votados: repetir a chamada (ex.: depois de um
+    # reload que já avançou o índice) não pula um cenário ainda não votado
+    current_index = skip_decided_scenarios()
     app.logger.debug(f"next_scenario: Avançando para cenário {current_index}, decisões atuais: {session.get('decisions', {})}")
 
-    app.logger.debug(f"Avançando para o cenário índice: {current_index}")
-
     # Verifica se todos os cenários foram concluídos
     if current_index >= TOTAL_SCENARIOS:
         app.logger.debug("Todos os cenários concluídos. Retornando is_complete=True.")
-        # Retorna um sinal de conclusão e a URL do resumo
         return jsonify({
             'is_complete': True,
             'summary_url': url_for('index') # A rota index lida com o resumo
         })
-    else:
-        # Obtém os dados do próximo cenário (agora com o índice atualizado)
-        try:
-            next_scenario_data = SCENARIOS[current_index]
-            progress = (current_index / TOTAL_SCENARIOS) * 100
-            emoji = get_emoji(next_scenario_data['image'])
-
-            app.logger.debug(f"Retornando dados para o cenário {current_index + 1}")
-            # Retorna os dados do próximo cenário em formato JSON
-            return jsonify({
-                'is_complete': False,
-                'scenario': next_scenario_data,
-                'progress': progress,
-                'current_scenario_number': current_index + 1,
-                'total_scenarios': TOTAL_SCENARIOS,
-                'emoji': emoji
-            })
-        except IndexError:
-            app.logger.error(f"Erro: Índice {current_index} fora dos limites para SCENARIOS.")
-            # Se o índice estiver fora do alcance por algum motivo, trata como completo
-            return jsonify({
-                'is_complete': True,
-                'summary_url': url_for('index')
-            })
-        except Exception as e:
-            app.logger.error(f"Erro inesperado ao preparar próximo cenário: {e}")
-            return jsonify({"error": "Internal server error loading next scenario."}), 500
+    return jsonify({
+        'is_complete': False,
+        'current_scenario_number': current_index + 1
+    })
 
 
 @app.route("/reset")
@@ -546,6 +679,4 @@ if __name__ == "__main__":
     # debug=True ativa o recarregamento automático e mensagens de erro detalhadas
     # host='0.0.0.0' torna o servidor acessível na rede local
     port = int(os.environ.get("PORT", 5001))
-    # In production, debug should be set to False
-    debug_mode = os.environ.get("FLASK_ENV") != "production"
-    app.run(host='0.0.0.0', port=port, debug=debug_mode)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=DEBUG_MODE)
\ No newline at end of file
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do tempo até o próximo card (time-to-next-card).
+
+Compara, para cada transição de cenário:
+- fluxo antigo: POST /decision e, só depois, GET /next_scenario bloqueante
+  para obter os dados do próximo card;
+- fluxo novo: POST /decision, que já traz o próximo card em 'next'
+  (o GET /next_scenario é disparado depois, fora do tempo medido).
+
+Usa app.test_client() com uma latência de rede simulada (--rtt) somada a cada
+requisição. As chamadas ao Supabase são substituídas por stubs instantâneos,
+pois custam o mesmo nos dois fluxos.
+
+Uso: python bench_next_card.py [--rtt 80] [--rounds 20]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+# O benchmark não fala com o Supabase de verdade
+os.environ.pop("SUPABASE_URL", None)
+os.environ.pop("SUPABASE_KEY", None)
+
+import app as park_app
+
+
+def timed_request(client, rtt: float, method: str, url: str, **kwargs):
+    """
+    Executa uma requisição somando a latência de rede simulada. Retorna (resposta, segundos).
+    """
+    start = time.perf_counter()
+    time.sleep(rtt)
+    response = client.open(url, method=method, **kwargs)
+    return response, time.perf_counter() - start
+
+
+def run_round(client, rtt: float, prefetch: bool) -> list[float]:
+    """
+    Percorre todos os cenários uma vez e retorna o tempo de cada transição.
+    """
+    client.get("/reset")
+    client.get("/")
+    timings = []
+    while True:
+        response, elapsed = timed_request(client, rtt, "POST", "/decision", data={"decision": "yes"})
+        data = response.get_json()
+        if prefetch:
+            assert "next" in data, "resposta de /decision sem o próximo cenário"
+            # Avanço de índice disparado sem bloquear o card (fora do tempo medido)
+            timed_request(client, rtt, "GET", "/next_scenario")
+        else:
+            _, next_elapsed = timed_request(client, rtt, "GET", "/next_scenario")
+            elapsed += next_elapsed
+        timings.append(elapsed)
+        if data["next"]["is_complete"]:
+            return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rtt", type=float, default=80.0, help="latência de rede simulada por requisição, em ms")
+    parser.add_argument("--rounds", type=int, default=20, help="quantas vezes percorrer todos os cenários")
+    args = parser.parse_args()
+    rtt = args.rtt / 1000
+
+    park_app.app.logger.setLevel(logging.CRITICAL)
+    # Stubs do Supabase: mostram resultados sem chamadas de rede
+    park_app.supabase = object()
+    park_app.insert_vote = lambda vote_data: None
+    park_app.fetch_vote_counts = lambda scenario_id: (0, 0)
+
+    client = park_app.app.test_client()
+    for label, prefetch in (("antes (decision + next_scenario)", False), ("depois (next embutido)", True)):
+        timings = [t for _ in range(args.rounds) for t in run_round(client, rtt, prefetch)]
+        print(f"{label:34s} mediana {statistics.median(timings) * 1000:7.1f} ms  "
+              f"p95 {statistics.quantiles(timings, n=20)[18] * 1000:7.1f} ms  ({len(timings)} transições, RTT {args.rtt:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,11 @@ document.addEventListener('DOMContentLoaded', () => {
         return; // Interrompe a execução
     }
 
+    // Dados do próximo cenário, pré-carregados na resposta de /decision
+    let prefetchedNextScenario = null;
+    // Promessa do avanço de índice em andamento (/next_scenario), disparado sem bloquear a UI
+    let pendingAdvance = Promise.resolve();
+
     // Função para atualizar a interface com os dados do novo cenário
     function updateScenarioUI(data) {
         if (data.is_complete) {
@@ -80,6 +85,10 @@ document.addEventListener('DOMContentLoaded', () => {
         buttonYes.classList.add('opacity-50', 'cursor-not-allowed');
 
         try {
+            // A sessão é um cookie: o avanço de índice precisa ter terminado antes de enviar
+            // a próxima decisão, senão o voto seria registrado no cenário anterior.
+            await pendingAdvance;
+
             // Envia a requisição POST para o backend usando a URL definida no HTML
             const response = await fetch(window.handleDecisionUrl, {
                 method: 'POST',
@@ -123,9 +132,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 const noPercentageSpan = document.getElementById('no-percentage');
                 const yesCountSpan = document.getElementById('yes-count');
                 const noCountSpan = document.getElementById('no-count');
+                const voteBars = document.getElementById('vote-bars');
+                const voteCounts = document.getElementById('vote-counts');
 
                 // Verifica se os elementos da barra de votação foram encontrados
-                if (!yourVoteText || !yesBar || !noBar || !yesPercentageSpan || !noPercentageSpan || !yesCountSpan || !noCountSpan) {
+                if (!yourVoteText || !yesBar || !noBar || !yesPercentageSpan || !noPercentageSpan || !yesCountSpan || !noCountSpan || !voteBars || !voteCounts) {
                     console.error("Erro: Elementos da barra de votação não encontrados no DOM. Verifique os IDs em scenario.html.");
                     // Tenta reabilitar botões Sim/Não para evitar travamento, mesmo que escondidos
                     buttonNo.disabled = false;
@@ -139,45 +150,55 @@ document.addEventListener('DOMContentLoaded', () => {
                     return; // Interrompe se elementos cruciais faltarem
                 }
 
-                // Atualiza o texto do voto do usuário
-                yourVoteText.textContent = `Você votou ${data.your_decision ? 'Sim 👍' : 'Não 👎'}. Veja como os outros votaram:`;
+                const yourVote = `Você votou ${data.your_decision ? 'Sim 👍' : 'Não 👎'}.`;
+                // Sem contagem conhecida (Supabase indisponível), mostra apenas o voto do usuário
+                voteBars.classList.toggle('hidden', !data.counts_available);
+                voteCounts.classList.toggle('hidden', !data.counts_available);
 
-                const totalVotes = data.yes_votes + data.no_votes;
-                let yesPercentage = 0;
-                let noPercentage = 0;
-
-                if (totalVotes > 0) {
-                    yesPercentage = Math.round((data.yes_votes / totalVotes) * 100);
-                    noPercentage = 100 - yesPercentage; // Garante que some 100%
+                if (!data.counts_available) {
+                    yourVoteText.textContent = `${yourVote} A contagem de votos está temporariamente indisponível.`;
                 } else {
-                    // Caso especial: primeiro voto (ou nenhum voto ainda)
-                    // Define a barra correspondente ao voto do usuário como 100% visualmente
-                    if (data.your_decision) {
-                        yesPercentage = 100;
-                        noPercentage = 0;
+                    // Atualiza o texto do voto do usuário
+                    yourVoteText.textContent = `${yourVote} Veja como os outros votaram:`;
+
+                    const totalVotes = data.yes_votes + data.no_votes;
+                    let yesPercentage = 0;
+                    let noPercentage = 0;
+
+                    if (totalVotes > 0) {
+                        yesPercentage = Math.round((data.yes_votes / totalVotes) * 100);
+                        noPercentage = 100 - yesPercentage; // Garante que some 100%
                     } else {
-                        yesPercentage = 0;
-                        noPercentage = 100;
+                        // Caso especial: primeiro voto (ou nenhum voto ainda)
+                        // Define a barra correspondente ao voto do usuário como 100% visualmente
+                        if (data.your_decision) {
+                            yesPercentage = 100;
+                            noPercentage = 0;
+                        } else {
+                            yesPercentage = 0;
+                            noPercentage = 100;
+                        }
                     }
-                }
 
 
-                // Atualiza a largura das barras
-                yesBar.style.width = `${yesPercentage}%`;
-                noBar.style.width = `${noPercentage}%`;
+                    // Atualiza a largura das barras
+                    yesBar.style.width = `${yesPercentage}%`;
+                    noBar.style.width = `${noPercentage}%`;
 
-                // Atualiza o texto das porcentagens (mostra apenas se for > 10%)
-                yesPercentageSpan.textContent = yesPercentage > 10 ? `${yesPercentage}%` : '';
-                noPercentageSpan.textContent = noPercentage > 10 ? `${noPercentage}%` : '';
+                    // Atualiza o texto das porcentagens (mostra apenas se for > 10%)
+                    yesPercentageSpan.textContent = yesPercentage > 10 ? `${yesPercentage}%` : '';
+                    noPercentageSpan.textContent = noPercentage > 10 ? `${noPercentage}%` : '';
 
-                // Atualiza a contagem de votos
-                yesCountSpan.textContent = `Sim: ${data.yes_votes}`;
-                noCountSpan.textContent = `Não: ${data.no_votes}`;
+                    // Atualiza a contagem de votos
+                    yesCountSpan.textContent = `Sim: ${data.yes_votes}`;
+                    noCountSpan.textContent = `Não: ${data.no_votes}`;
+                }
 
                 // Mostra a div de resultados e o botão Próximo
                 voteResultsDiv.classList.remove('hidden');
                 buttonNext.classList.remove('hidden');
                 buttonNext.dataset.nextUrl = data.next_scenario_url; // Armazena a URL
+                prefetchedNextScenario = data.next || null; // Próximo cenário já pronto para exibir
 
                 // Reabilita os botões Sim/Não (eles estão escondidos, mas redefine o estado para o próximo cenário)
                 buttonNo.disabled = false;
@@ -221,7 +242,23 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // Função assíncrona para buscar o próximo cenário
+    // Envia o avanço de índice ao backend. Em caso de falha, recarrega a página
+    // para que a sessão e a interface voltem a ficar sincronizadas.
+    function advanceScenario(nextUrl) {
+        return fetch(nextUrl).then((response) => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+        }).catch((error) => {
+            console.error('Erro ao avançar para o próximo cenário:', error);
+            alert('Ocorreu um erro ao carregar o próximo cenário. A página será recarregada.');
+            window.location.reload();
+            // Mantém a promessa pendente para não enviar decisões enquanto a página recarrega
+            return new Promise(() => {});
+        });
+    }
+
+    // Exibe o próximo cenário a partir dos dados pré-carregados
     async function fetchNextScenario() {
         const nextUrl = buttonNext.dataset.nextUrl;
         if (!nextUrl) {
@@ -230,35 +267,28 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
+        const nextData = prefetchedNextScenario;
+        prefetchedNextScenario = null;
+
         // Desabilita o botão Próximo para evitar cliques múltiplos
         buttonNext.disabled = true;
         buttonNext.classList.add('opacity-50', 'cursor-not-allowed');
 
-        try {
-            const response = await fetch(nextUrl); // Método GET é o padrão
-            if (!response.ok) {
-                // Tenta ler a resposta de erro se possível
-                let errorBody = await response.text();
-                console.error("Erro HTTP:", response.status, errorBody);
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            const data = await response.json();
-
-            // A função updateScenarioUI já lida com esconder/mostrar os elementos corretos
-            updateScenarioUI(data); // Esta função já lida com is_complete e reabilita botões
+        pendingAdvance = advanceScenario(nextUrl);
 
-        } catch (error) {
-            console.error('Erro ao buscar próximo cenário:', error);
-            alert('Ocorreu um erro ao carregar o próximo cenário. Por favor, recarregue a página.');
-            // Reabilita o botão Próximo em caso de erro para permitir nova tentativa
-            buttonNext.disabled = false;
-            buttonNext.classList.remove('opacity-50', 'cursor-not-allowed');
-            // Garante que a div de resultados esteja escondida em caso de erro
-             voteResultsDiv.classList.add('hidden');
-             // Garante que os botões Sim/Não estejam visíveis se o carregamento falhar
-             buttonNo.classList.remove('hidden');
-             buttonYes.classList.remove('hidden');
+        if (!nextData) {
+            // Sem dados pré-carregados: espera o avanço e deixa o backend renderizar o cenário atual
+            await pendingAdvance;
+            window.location.reload();
+            return;
+        }
+        if (nextData.is_complete) {
+            // O resumo depende do índice salvo na sessão, então espera o avanço antes de redirecionar
+            await pendingAdvance;
         }
+
+        // A função updateScenarioUI já lida com esconder/mostrar os elementos corretos
+        updateScenarioUI(nextData); // Esta função já lida com is_complete e reabilita botões
     }
 
 
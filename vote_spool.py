@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Spool local e durável para votos que o Supabase não conseguiu receber.
+
+Quando o insert no Supabase falha (erro ou timeout), o voto é gravado num
+journal SQLite local em vez de ser descartado. Uma thread em segundo plano
+reenvia os votos pendentes quando o backend volta a responder.
+
+- VoteSpool: journal SQLite, deduplicado por (session_uuid, scenario_id).
+  Votos rejeitados repetidamente pelo backend vão para a tabela dead_votes.
+  Guarda também a última contagem conhecida de cada cenário (vote_counts).
+- VoteReplayer: thread que drena o spool e controla a saúde do backend.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class VoteSpool:
+    """
+    Journal SQLite de votos pendentes.
+
+    Usa WAL com synchronous=NORMAL: cada append é um commit no WAL e os
+    fsyncs são agrupados nos checkpoints, o que sobrevive a uma queda do
+    processo sem pagar um fsync por voto.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pending_votes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_uuid TEXT NOT NULL,
+                scenario_id INTEGER NOT NULL,
+                decision INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                UNIQUE(session_uuid, scenario_id)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vote_counts (
+                scenario_id INTEGER PRIMARY KEY,
+                yes_votes INTEGER NOT NULL,
+                no_votes INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        # Spools criados antes da coluna attempts
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pending_votes)")]
+        if 'attempts' not in columns:
+            self._conn.execute("ALTER TABLE pending_votes ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dead_votes (
+                id INTEGER PRIMARY KEY,
+                session_uuid TEXT NOT NULL,
+                scenario_id INTEGER NOT NULL,
+                decision INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                failed_at REAL NOT NULL
+            )
+            """
+        )
+
+    def save_counts(self, scenario_id: int, yes_votes: int, no_votes: int) -> None:
+        """
+        Grava a última contagem de votos conhecida no Supabase para um cenário.
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO vote_counts (scenario_id, yes_votes, no_votes, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(scenario_id)
+                DO UPDATE SET yes_votes = excluded.yes_votes, no_votes = excluded.no_votes,
+                              updated_at = excluded.updated_at
+                """,
+                (scenario_id, yes_votes, no_votes, time.time()),
+            )
+
+    def last_counts(self, scenario_id: int) -> tuple[int, int] | None:
+        """
+        Retorna a última contagem (sim, não) gravada para um cenário, ou None se não houver.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT yes_votes, no_votes FROM vote_counts WHERE scenario_id = ?",
+                (scenario_id,),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def append(self, vote_data: dict[str, Any]) -> None:
+        """
+        Grava um voto no spool. Um voto repetido para o mesmo
+        (session_uuid, scenario_id) substitui o anterior.
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO pending_votes (session_uuid, scenario_id, decision, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(session_uuid, scenario_id)
+                DO UPDATE SET decision = excluded.decision, created_at = excluded.created_at
+                """,
+                (vote_data['session_uuid'], vote_data['scenario_id'],
+                 int(vote_data['decision']), time.time()),
+            )
+
+    def pending(self, limit: int = 50) -> list[tuple[int, dict[str, Any]]]:
+        """
+        Retorna até `limit` votos pendentes como (id, vote_data), do mais antigo ao mais novo.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, session_uuid, scenario_id, decision FROM pending_votes ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            (row_id, {'scenario_id': scenario_id, 'decision': bool(decision), 'session_uuid': session_uuid})
+            for row_id, session_uuid, scenario_id, decision in rows
+        ]
+
+    def remove(self, row_ids: list[int]) -> None:
+        """
+        Remove do spool os votos já entregues ao backend.
+        """
+        if not row_ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM pending_votes WHERE id = ?", [(row_id,) for row_id in row_ids])
+
+    def record_failure(self, row_id: int, error: str, max_attempts: int) -> bool:
+        """
+        Registra uma rejeição do backend para um voto pendente. Ao atingir
+        `max_attempts`, move o voto para dead_votes. Retorna True se foi movido.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("UPDATE pending_votes SET attempts = attempts + 1 WHERE id = ?", (row_id,))
+                row = self._conn.execute("SELECT attempts FROM pending_votes WHERE id = ?", (row_id,)).fetchone()
+                dead = row is not None and row[0] >= max_attempts
+                if dead:
+                    self._conn.execute(
+                        """
+                        INSERT OR REPLACE INTO dead_votes
+                            (id, session_uuid, scenario_id, decision, created_at, attempts, last_error, failed_at)
+                        SELECT id, session_uuid, scenario_id, decision, created_at, attempts, ?, ?
+                        FROM pending_votes WHERE id = ?
+                        """,
+                        (error, time.time(), row_id),
+                    )
+                    self._conn.execute("DELETE FROM pending_votes WHERE id = ?", (row_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dead
+
+    def pending_counts(self, scenario_id: int) -> tuple[int, int]:
+        """
+        Retorna (sim, não) dos votos ainda no spool para um cenário.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT decision, COUNT(*) FROM pending_votes WHERE scenario_id = ? GROUP BY decision",
+                (scenario_id,),
+            ).fetchall()
+        counts = {bool(decision): count for decision, count in rows}
+        return counts.get(True, 0), counts.get(False, 0)
+
+
+class VoteReplayer:
+    """
+    Thread que drena o spool e funciona como circuit breaker do backend.
+
+    Depois de uma queda (`is_outage` verdadeiro para o erro), `backend_healthy`
+    fica False por `cooldown` segundos, e as requisições gravam direto no spool
+    sem esperar pela chamada que está falhando. Um reenvio bem-sucedido
+    restaura a saúde imediatamente. Outros erros são rejeições do próprio
+    voto: ele é pulado e, após `max_attempts`, vai para dead_votes.
+    """
+
+    def __init__(self, spool: VoteSpool, send_vote: Callable[[dict[str, Any]], None],
+                 is_outage: Callable[[Exception], bool],
+                 interval: float = 5.0, cooldown: float = 30.0, batch_size: int = 50,
+                 max_attempts: int = 5, log: logging.Logger | None = None) -> None:
+        self.spool = spool
+        self.send_vote = send_vote
+        self.is_outage = is_outage
+        self.max_attempts = max_attempts
+        self.interval = interval
+        self.cooldown = cooldown
+        self.batch_size = batch_size
+        self.log = log or logger
+        self._unhealthy_until = 0.0
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def backend_healthy(self) -> bool:
+        return time.monotonic() >= self._unhealthy_until
+
+    def mark_unhealthy(self) -> None:
+        self._unhealthy_until = time.monotonic() + self.cooldown
+
+    def mark_healthy(self) -> None:
+        self._unhealthy_until = 0.0
+
+    def start(self) -> None:
+        """
+        Inicia a thread de reenvio (uma vez por processo).
+        """
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="vote-replayer", daemon=True)
+            self._thread.start()
+
+    def drain_once(self) -> int:
+        """
+        Reenvia um lote de votos pendentes. Para na primeira queda do backend,
+        marcando-o como indisponível; votos rejeitados são pulados.
+        Retorna quantos votos foram entregues.
+
+        Cada voto sai do spool logo após ser entregue, para que nunca seja
+        contado ao mesmo tempo como pendente e como já registrado.
+        """
+        delivered = 0
+        for row_id, vote_data in self.spool.pending(self.batch_size):
+            try:
+                self.send_vote(vote_data)
+            except Exception as e:
+                if self.is_outage(e):
+                    self.log.warning(f"Supabase indisponível ao reenviar voto do spool (id={row_id}): {e}")
+                    self.mark_unhealthy()
+                    break
+                if self.spool.record_failure(row_id, str(e), self.max_attempts):
+                    self.log.error(f"Voto do spool (id={row_id}) rejeitado {self.max_attempts} vezes, movido para dead_votes: {e}")
+                else:
+                    self.log.warning(f"Voto do spool (id={row_id}) rejeitado pelo Supabase: {e}")
+                continue
+            self.spool.remove([row_id])
+            delivered += 1
+            self.mark_healthy()
+        if delivered:
+            self.log.info(f"{delivered} voto(s) reenviado(s) do spool para o Supabase.")
+        return delivered
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.drain_once()
+            except Exception as e:
+                self.log.error(f"Erro inesperado no reenvio do spool de votos: {e}")
+            time.sleep(self.interval)